@@ -0,0 +1,29 @@
+"""
+model で使うSQL文
+
+SQLは毎回 text() を作らず、モジュールロード時に一度だけ作って使い回す。
+同じクエリは必ずここの定数を使い、表記揺れでキャッシュが分かれないようにする。
+"""
+from sqlalchemy import text
+
+Q_INSERT_USER = text(
+    "INSERT INTO `user` (`name`, `token`, `leader_card_id`)"
+    " VALUES (:name, :token, :leader_card_id)"
+)
+Q_SELECT_USER_BY_TOKEN = text(
+    "SELECT `id`, `name`, `leader_card_id` FROM `user` WHERE `token` = :token LIMIT 1"
+)
+Q_UPDATE_USER = text(
+    "UPDATE `user` SET `name` = :name, `leader_card_id` = :leader_card_id"
+    " WHERE `token` = :token"
+)
+
+Q_INSERT_ROOM = text(
+    "INSERT INTO `room` (`live_id`, `host_id`) VALUES (:live_id, :host_id)"
+)
+# リトライなどで同じユーザーが再度登録されても失敗しないようにする
+Q_INSERT_ROOM_MEMBER = text(
+    "INSERT INTO `room_member` (`room_id`, `member_id`, `diff`)"
+    " VALUES (:room_id, :member_id, :diff) AS new"
+    " ON DUPLICATE KEY UPDATE `diff` = new.`diff`"
+)
@@ -1,24 +1,53 @@
-import fastapi.exception_handlers
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
 from fastapi import FastAPI, HTTPException, status
+from fastapi.exception_handlers import request_validation_exception_handler
 from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
 
-from . import model
-from .auth import UserToken
+from . import config, model
+from .auth import CurrentUser, UserToken
 from .model import LiveDifficulty
 
+logger = logging.getLogger(__name__)
+
+# ログの出力はリクエスト処理とは別スレッドで行う
+# (メッセージの整形は QueueHandler が呼び出し側のスレッドで行う)
+# ルートロガーのハンドラで同期的に書き出されないよう、伝播は止める
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_app_logger = logging.getLogger(__package__)
+_app_logger.setLevel(config.LOG_LEVEL)
+_app_logger.addHandler(QueueHandler(_log_queue))
+_app_logger.propagate = False
+# lifespan が動かない場合 (TestClient を with なしで使う場合など) でもキューが
+# 溜まり続けないよう、インポート時に開始してプロセス終了時に止める
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+
 app = FastAPI()
+# ポーリングされる /room/wait などのレスポンスが大きくなったときに帯域を節約する
+app.add_middleware(GZipMiddleware, minimum_size=512)
 
 
-# リクエストのvalidation errorをprintする
+# リクエストのvalidation errorをログに出す
 # このエラーが出たら、リクエストのModel定義が間違っている
+# LOG_LEVEL=DEBUG のときだけ出力する (make run では有効になる)
 @app.exception_handler(RequestValidationError)
 async def handle_request_validation_error(req, exc):
-    print("Request validation error")
-    print(f"{req.url=}\n{exc.body=}\n{exc=!s}")
-    return await fastapi.exception_handlers.request_validation_exception_handler(
-        req, exc
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Request validation error\nreq.url=%s\nexc.body=%r\nexc=%s",
+            req.url,
+            exc.body,
+            exc,
+        )
+    return await request_validation_exception_handler(req, exc)
 
 
 # Sample API
@@ -69,7 +98,10 @@ class Empty(BaseModel):
 def update(req: UserCreateRequest, token: UserToken) -> Empty:
     """Update user attributes"""
     # print(req)
-    model.update_user(token, req.user_name, req.leader_card_id)
+    try:
+        model.update_user(token, req.user_name, req.leader_card_id)
+    except model.InvalidToken:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="invalid token")
     return Empty()
 
 
@@ -86,8 +118,7 @@ class CreateRoomRequest(BaseModel):
 
 
 @app.post("/room/create")
-def create(token: UserToken, req: CreateRoomRequest) -> RoomID:
+def create(user: CurrentUser, req: CreateRoomRequest) -> RoomID:
     """ルーム作成リクエスト"""
-    print("/room/create", req)
-    room_id = model.create_room(token, req.live_id, req.select_difficulty)
+    room_id = model.create_room(user, req.live_id, req.select_difficulty)
     return RoomID(room_id=room_id)
@@ -3,13 +3,18 @@
 
 引数に `token: UserToken` を指定することで認証を行い、そのユーザーの
 tokenを取得できる。
+`user: CurrentUser` を指定すると、tokenに対応するユーザーをリクエストごとに
+一度だけ引いて取得できる。
 """
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security.http import HTTPAuthorizationCredentials, HTTPBearer
 
-__all__ = ["UserToken"]
+from . import model
+from .model import SafeUser
+
+__all__ = ["CurrentUser", "UserToken"]
 bearer = HTTPBearer()
 
 
@@ -21,3 +26,13 @@ async def get_auth_token(cred: HTTPAuthorizationCredentials = Depends(bearer)) -
 
 
 UserToken = Annotated[str, Depends(get_auth_token)]
+
+
+def get_current_user(token: UserToken) -> SafeUser:
+    user = model.get_user_by_token(token)
+    if user is None:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="invalid token")
+    return user
+
+
+CurrentUser = Annotated[SafeUser, Depends(get_current_user)]
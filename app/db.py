@@ -2,4 +2,15 @@ from sqlalchemy import create_engine
 
 from . import config
 
-engine = create_engine(config.DATABASE_URI, future=True, echo=True, pool_recycle=300)
+# ハンドラは def で定義しているので、FastAPIのスレッドプールから並行してDBを叩く。
+# プールが小さいとチェックアウト待ちになる。サイズは config で設定する。
+engine = create_engine(
+    config.DATABASE_URI,
+    future=True,
+    echo=config.DATABASE_ECHO,
+    pool_size=config.DATABASE_POOL_SIZE,
+    max_overflow=config.DATABASE_MAX_OVERFLOW,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+)
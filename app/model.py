@@ -1,19 +1,31 @@
+import logging
+import threading
 import uuid
+from dataclasses import dataclass
 from enum import IntEnum
 
-from pydantic import BaseModel, ConfigDict
-from sqlalchemy import text
+from cachetools import TTLCache
 from sqlalchemy.exc import NoResultFound
 
+from ._sql import (
+    Q_INSERT_ROOM,
+    Q_INSERT_ROOM_MEMBER,
+    Q_INSERT_USER,
+    Q_SELECT_USER_BY_TOKEN,
+    Q_UPDATE_USER,
+)
 from .db import engine
 
+logger = logging.getLogger(__name__)
+
 
 class InvalidToken(Exception):
     """指定されたtokenが不正だったときに投げるエラー"""
 
 
-# サーバーで生成するオブジェクトは strict を使う
-class SafeUser(BaseModel, strict=True):
+# DBの行から毎回作るので、validationを行わない軽量なdataclassにする
+@dataclass(frozen=True, slots=True)
+class SafeUser:
     """token を含まないUser"""
 
     id: int
@@ -26,52 +38,69 @@ def create_user(name: str, leader_card_id: int) -> str:
     # UUID4は天文学的な確率だけど衝突する確率があるので、気にするならリトライする必要がある。
     # サーバーでリトライしない場合は、クライアントかユーザー（手動）にリトライさせることになる。
     # ユーザーによるリトライは一般的には良くないけれども、確率が非常に低ければ許容できる場合もある。
-    token = str(uuid.uuid4())
+    token = uuid.uuid4().hex
     with engine.begin() as conn:
         result = conn.execute(
-            text(
-                "INSERT INTO `user` (name, token, leader_card_id)"
-                " VALUES (:name, :token, :leader_card_id)"
-            ),
+            Q_INSERT_USER,
             {"name": name, "token": token, "leader_card_id": leader_card_id},
         )
-        print(f"create_user(): {result.lastrowid=}")  # DB側で生成されたPRIMARY KEYを参照できる
+        # DB側で生成されたPRIMARY KEYを参照できる
+        logger.debug("create_user(): result.lastrowid=%s", result.lastrowid)
     return token
 
 
 def _get_user_by_token(conn, token: str) -> SafeUser | None:
-    result = conn.execute(
-        text("SELECT `id`, `name`, `leader_card_id` FROM `user` WHERE `token`=:token"),
-        {"token": token},
-    )
+    result = conn.execute(Q_SELECT_USER_BY_TOKEN, {"token": token})
     try:
         row = result.one()
     except NoResultFound:
         return None
-    return SafeUser.model_validate(row, from_attributes=True)
+    return SafeUser(*row)
+
+
+# token -> SafeUser のキャッシュ。認証のたびにDBを引かないようにする。
+# キャッシュはプロセスごとにあるので、update_user() で破棄されるのは更新を処理した
+# プロセスの分だけ。複数ワーカーで動かす場合、他のワーカーには最大でTTLの間だけ
+# 古いユーザー情報が残る。
+_user_cache: TTLCache = TTLCache(maxsize=65536, ttl=30)
+_user_cache_lock = threading.Lock()
+# update_user() のたびに進める世代。更新前の行を読んだ get_user_by_token() が
+# 破棄後のキャッシュに古い値を書き戻さないようにする。
+_user_cache_generation = 0
 
 
 def get_user_by_token(token: str) -> SafeUser | None:
+    with _user_cache_lock:
+        user = _user_cache.get(token)
+        generation = _user_cache_generation
+    if user is not None:
+        return user
+
     with engine.begin() as conn:
-        return _get_user_by_token(conn, token)
+        user = _get_user_by_token(conn, token)
+    if user is not None:
+        with _user_cache_lock:
+            if generation == _user_cache_generation:
+                _user_cache[token] = user
+    return user
 
 
 def update_user(token: str, name: str, leader_card_id: int) -> None:
     with engine.begin() as conn:
-        user = _get_user_by_token(conn, token)
-        if user is None:
-            raise InvalidToken("Invalid token")
-
-        # Now, update the user's information
-        conn.execute(
-            text(
-                "UPDATE `user` SET `name` = :name, `leader_card_id` = :leader_card_id "
-                "WHERE `token` = :token"
-            ),
+        # 事前にSELECTせず、更新された行がなければ不正なtokenとみなす
+        result = conn.execute(
+            Q_UPDATE_USER,
             {"name": name, "leader_card_id": leader_card_id, "token": token},
         )
+        if result.rowcount == 0:
+            raise InvalidToken("Invalid token")
+
+        logger.debug("User information updated successfully")
 
-        print("User information updated successfully")
+    global _user_cache_generation
+    with _user_cache_lock:
+        _user_cache_generation += 1
+        _user_cache.pop(token, None)
 
 
 # IntEnum の使い方の例
@@ -82,10 +111,14 @@ class LiveDifficulty(IntEnum):
     hard = 2
 
 
-def create_room(token: str, live_id: int, difficulty: LiveDifficulty):
+def create_room(user: SafeUser, live_id: int, difficulty: LiveDifficulty) -> int:
     """部屋を作ってroom_idを返します"""
     with engine.begin() as conn:
-        user = _get_user_by_token(conn, token)
-        if user is None:
-            raise InvalidToken
-        # TODO: 実装
+        result = conn.execute(Q_INSERT_ROOM, {"live_id": live_id, "host_id": user.id})
+        room_id = result.lastrowid
+        # ホスト自身も部屋のメンバーとして登録する
+        conn.execute(
+            Q_INSERT_ROOM_MEMBER,
+            {"room_id": room_id, "member_id": user.id, "diff": int(difficulty)},
+        )
+    return room_id
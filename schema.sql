@@ -4,8 +4,27 @@ DROP TABLE IF EXISTS `user`;
 CREATE TABLE `user` (
   `id` bigint NOT NULL AUTO_INCREMENT,
   `name` varchar(255) DEFAULT NULL,
-  `token` varchar(255) DEFAULT NULL,
+  `token` char(32) DEFAULT NULL,
   `leader_card_id` int DEFAULT NULL,
   PRIMARY KEY (`id`),
   UNIQUE KEY `token` (`token`)
 );
+
+DROP TABLE IF EXISTS `room`;
+CREATE TABLE `room` (
+  `room_id` bigint NOT NULL AUTO_INCREMENT,
+  `live_id` int NOT NULL,
+  `host_id` bigint NOT NULL,
+  `capacity` int NOT NULL DEFAULT 4,
+  `waiting_status` int NOT NULL DEFAULT 1,
+  PRIMARY KEY (`room_id`),
+  KEY `live_id` (`live_id`)
+);
+
+DROP TABLE IF EXISTS `room_member`;
+CREATE TABLE `room_member` (
+  `room_id` bigint NOT NULL,
+  `member_id` bigint NOT NULL,
+  `diff` int NOT NULL,
+  PRIMARY KEY (`room_id`, `member_id`)
+);
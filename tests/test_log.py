@@ -0,0 +1,34 @@
+import logging
+import threading
+
+from fastapi.testclient import TestClient
+
+from app import api
+from app.api import app
+
+client = TestClient(app)
+
+
+class _RecordHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.received = threading.Event()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.received.set()
+
+
+def test_app_log_reaches_handler(monkeypatch):
+    handler = _RecordHandler()
+    monkeypatch.setattr(
+        api._log_listener, "handlers", (*api._log_listener.handlers, handler)
+    )
+
+    response = client.get("/")
+    assert response.status_code == 200
+
+    logging.getLogger("app.model").warning("warning from app.model")
+    assert handler.received.wait(timeout=5)
+    assert handler.records[0].getMessage() == "warning from app.model"
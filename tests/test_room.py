@@ -68,3 +68,12 @@ def test_room_1():
     )
     assert response.status_code == 200
     print("room/end response:", response.json())
+
+
+def test_room_create_invalid_token():
+    response = client.post(
+        "/room/create",
+        headers={"Authorization": "bearer invalid_token"},
+        json={"live_id": 1001, "select_difficulty": 1},
+    )
+    assert response.status_code == 401
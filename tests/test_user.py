@@ -23,3 +23,41 @@ def test_create_user():
     assert response_data.keys() == {"id", "name", "leader_card_id"}
     assert response_data["name"] == "test1"
     assert response_data["leader_card_id"] == 1000
+
+
+def test_update_user():
+    response = client.post(
+        "/user/create", json={"user_name": "test2", "leader_card_id": 1000}
+    )
+    assert response.status_code == 200
+
+    token = response.json()["user_token"]
+    headers = {"Authorization": f"bearer {token}"}
+
+    # 更新前に一度引いて、ユーザー情報をキャッシュに載せておく
+    response = client.get("/user/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == "test2"
+
+    response = client.post(
+        "/user/update",
+        headers=headers,
+        json={"user_name": "test2-renamed", "leader_card_id": 2000},
+    )
+    assert response.status_code == 200
+
+    response = client.get("/user/me", headers=headers)
+    assert response.status_code == 200
+
+    response_data = response.json()
+    assert response_data["name"] == "test2-renamed"
+    assert response_data["leader_card_id"] == 2000
+
+
+def test_update_user_invalid_token():
+    response = client.post(
+        "/user/update",
+        headers={"Authorization": "bearer invalid_token"},
+        json={"user_name": "test3", "leader_card_id": 1000},
+    )
+    assert response.status_code == 401